@@ -28,11 +28,12 @@ def main():
     print("=" * 50)
 
     chart = client.get_chart_data(id_notation=4039, time_span="1Y")
-    print(f"  Total de puntos: {len(chart.points)}")
+    print(f"  Total de puntos: {len(chart)}")
 
-    if chart.points:
+    points = chart.points
+    if points:
         print(f"\n  Últimos 5 registros:")
-        for point in chart.points[-5:]:
+        for point in points[-5:]:
             print(f"    {point.date}: Open={point.open}, High={point.high}, Low={point.low}, Close={point.close}")
 
     # 3. Obtener datos intradía
@@ -41,11 +42,12 @@ def main():
     print("=" * 50)
 
     intraday = client.get_intraday(id_notation=4039)
-    print(f"  Total de puntos: {len(intraday.points)}")
+    print(f"  Total de puntos: {len(intraday)}")
 
-    if intraday.points:
+    intraday_points = intraday.points
+    if intraday_points:
         print(f"\n  Primeros 3 registros:")
-        for point in intraday.points[:3]:
+        for point in intraday_points[:3]:
             print(f"    {point.date}: Close={point.close}, Volume={point.volume}, %Rel={point.pctrel}")
 
     # 4. Convertir a DataFrame (requiere pandas)
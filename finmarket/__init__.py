@@ -3,7 +3,8 @@ Finmarket - Librería para obtener datos financieros de Finmarket Live
 """
 
 from .client import FinmarketClient
+from .async_client import AsyncFinmarketClient
 from .models import SearchResult, ChartData, ChartPoint
 
 __version__ = "1.0.0"
-__all__ = ["FinmarketClient", "SearchResult", "ChartData", "ChartPoint"]
+__all__ = ["FinmarketClient", "AsyncFinmarketClient", "SearchResult", "ChartData", "ChartPoint"]
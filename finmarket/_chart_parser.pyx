@@ -0,0 +1,289 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Parser en C de la respuesta del endpoint datachart (extensión opcional)
+
+Equivalente a `finmarket.client._parse_chart_chunks`, pero recorre el buffer de
+bytes con funciones de C en lugar de operaciones de str. Los números se parsean
+sin depender del locale (PyOS_string_to_double y enteros a mano), igual que float()
+e int() en Python.
+Se usa automáticamente cuando está compilada; si no, se usa el parser en Python.
+"""
+
+from cpython cimport array
+from cpython.ref cimport PyObject
+from libc.limits cimport LLONG_MAX
+from libc.math cimport isfinite
+from libc.string cimport memchr, memcmp
+
+cdef extern from "Python.h":
+    double PyOS_string_to_double(const char* s, char** endptr, PyObject* overflow_exception)
+    void PyErr_Clear()
+
+import array as _array
+
+cdef const char* _MARKER = b"{date:new Date("
+cdef Py_ssize_t _MARKER_LEN = 15
+
+# Con día/hora/minuto/segundo en ±_SMALL el timestamp en microsegundos cabe en long long
+cdef long long _SMALL = 10000000
+# Rango de timestamps (microsegundos desde 1970-01-01) que datetime puede representar,
+# de 0001-01-01 00:00:00 a 9999-12-31 23:59:59.999999 (igual que el parser en Python)
+cdef long long _TIMESTAMP_MIN = -62135596800000000
+cdef long long _TIMESTAMP_MAX = 253402300799999999
+
+cdef array.array _DOUBLE = _array.array("d")
+cdef array.array _INT64 = _array.array("q")
+cdef array.array _INT = _array.array("i")
+
+
+cdef inline bint _is_space(char c) nogil:
+    return c == b" " or c == b"\t" or c == b"\n" or c == b"\r"
+
+
+cdef bint _parse_double(const char* start, const char* end, double* out):
+    """Parsea un float que ocupa todo [start, end), con espacios opcionales"""
+    cdef char* stop
+    while start < end and _is_space(start[0]):
+        start += 1
+    if start == end:
+        return False
+    # A diferencia de strtod, siempre usa '.' como separador decimal; un desborde da ±inf
+    out[0] = PyOS_string_to_double(start, &stop, NULL)
+    if stop == start:
+        PyErr_Clear()
+        return False
+    if stop > end:
+        return False
+    while stop < end and _is_space(stop[0]):
+        stop += 1
+    return stop == end
+
+
+cdef int _parse_long(const char* start, const char* end, long long* out) nogil:
+    """
+    Parsea un entero decimal que ocupa todo [start, end), con espacios opcionales.
+
+    Devuelve 1 si es válido, 2 si es válido pero no cabe en long long y 0 si no es un entero.
+    """
+    cdef bint negative = False
+    cdef bint overflow = False
+    cdef long long value = 0
+    cdef int digit
+    while start < end and _is_space(start[0]):
+        start += 1
+    while end > start and _is_space((end - 1)[0]):
+        end -= 1
+    if start < end and (start[0] == b"-" or start[0] == b"+"):
+        negative = start[0] == b"-"
+        start += 1
+    if start == end:
+        return 0
+    while start < end:
+        digit = start[0] - 48
+        if digit < 0 or digit > 9:
+            return 0
+        if value > (LLONG_MAX - digit) // 10:
+            overflow = True
+        else:
+            value = value * 10 + digit
+        start += 1
+    out[0] = -value if negative else value
+    return 2 if overflow else 1
+
+
+cdef inline bint _key_is(const char* key, Py_ssize_t key_len, const char* name, Py_ssize_t name_len) nogil:
+    return key_len == name_len and memcmp(key, name, name_len) == 0
+
+
+cdef long long _days_from_civil(long long y, long long m, long long d) nogil:
+    """Días desde 1970-01-01 para una fecha del calendario gregoriano (y >= 1)"""
+    cdef long long era, yoe, doy, doe
+    if m <= 2:
+        y -= 1
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (m + (-3 if m > 2 else 9)) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+cdef const char* _find_marker(const char* p, const char* end) nogil:
+    """Busca el inicio del siguiente objeto ('{date:new Date(') en [p, end)"""
+    while end - p >= _MARKER_LEN:
+        p = <const char*>memchr(p, b"{", end - p)
+        if p == NULL or end - p < _MARKER_LEN:
+            return NULL
+        if memcmp(p, _MARKER, _MARKER_LEN) == 0:
+            return p
+        p += 1
+    return NULL
+
+
+def parse_chart(bytes buf):
+    """
+    Parsea la respuesta completa de datachart.
+
+    Args:
+        buf: Cuerpo de la respuesta en bytes
+
+    Returns:
+        Diccionario con una columna por campo, con las mismas claves y tipos que
+        el parser en Python
+    """
+    cdef const char* data = buf
+    cdef const char* end = data + len(buf)
+    cdef const char* p = data
+    cdef const char* obj
+    cdef const char* brace
+    cdef const char* paren
+    cdef const char* q
+    cdef const char* comma
+    cdef const char* colon
+    cdef const char* key
+    cdef const char* key_end
+    cdef Py_ssize_t capacity = buf.count(_MARKER[:_MARKER_LEN])
+    cdef Py_ssize_t count = 0
+    cdef Py_ssize_t n_values
+    cdef long long values[6]
+    cdef long long value
+    cdef long long days
+    cdef long long timestamp
+    cdef double number
+    cdef double close = 0.0, high = 0.0, low = 0.0, open_ = 0.0, pctrel = 0.0
+    cdef long long volume = 0, decimals = 2
+    cdef bint has_close, ok
+    cdef int status
+    cdef array.array column
+
+    cdef array.array timestamps = array.clone(_INT64, capacity, False)
+    cdef array.array opens = array.clone(_DOUBLE, capacity, False)
+    cdef array.array highs = array.clone(_DOUBLE, capacity, False)
+    cdef array.array lows = array.clone(_DOUBLE, capacity, False)
+    cdef array.array closes = array.clone(_DOUBLE, capacity, False)
+    cdef array.array volumes = array.clone(_INT64, capacity, False)
+    cdef array.array pctrels = array.clone(_DOUBLE, capacity, False)
+    cdef array.array decimals_col = array.clone(_INT, capacity, False)
+
+    while True:
+        obj = _find_marker(p, end)
+        if obj == NULL:
+            break
+        obj += _MARKER_LEN
+        brace = <const char*>memchr(obj, b"}", end - obj)
+        if brace == NULL:
+            # Objeto incompleto al final de la respuesta
+            break
+        p = brace + 1
+
+        paren = <const char*>memchr(obj, b")", brace - obj)
+        if paren == NULL:
+            continue
+
+        # Pares clave:valor entre ')' y '}'; los campos ausentes quedan con su valor por defecto
+        has_close = False
+        open_ = high = low = pctrel = 0.0
+        volume = 0
+        decimals = 2
+        q = paren + 1
+        while True:
+            comma = <const char*>memchr(q, b",", brace - q)
+            if comma == NULL:
+                comma = brace
+            colon = <const char*>memchr(q, b":", comma - q)
+            if colon != NULL:
+                key = q
+                key_end = colon
+                while key < key_end and _is_space(key[0]):
+                    key += 1
+                while key_end > key and _is_space((key_end - 1)[0]):
+                    key_end -= 1
+                if _parse_double(colon + 1, comma, &number):
+                    if _key_is(key, key_end - key, b"close", 5):
+                        close = number
+                        has_close = True
+                    elif _key_is(key, key_end - key, b"high", 4):
+                        high = number
+                    elif _key_is(key, key_end - key, b"low", 3):
+                        low = number
+                    elif _key_is(key, key_end - key, b"open", 4):
+                        open_ = number
+                    elif _key_is(key, key_end - key, b"pctrel", 6):
+                        pctrel = number
+                    elif isfinite(number):
+                        # Mismos rangos que el parser en Python (array 'q' e 'i'); fuera de ellos se omite
+                        if _key_is(key, key_end - key, b"volume", 6):
+                            if -9223372036854775808.0 <= number < 9223372036854775808.0:
+                                volume = <long long>number
+                        elif _key_is(key, key_end - key, b"decimals", 8):
+                            if -2147483649.0 < number < 2147483648.0:
+                                decimals = <long long>number
+            if comma == brace:
+                break
+            q = comma + 1
+
+        if not has_close:
+            continue
+
+        # Fecha: year, month, day[, hour, minute, second]
+        ok = True
+        n_values = 0
+        values[3] = values[4] = values[5] = 0
+        q = obj
+        while True:
+            comma = <const char*>memchr(q, b",", paren - q)
+            if comma == NULL:
+                comma = paren
+            status = _parse_long(q, comma, &value)
+            # Un valor que no cabe en long long solo invalida la fecha si se usa (los 6 primeros)
+            if status == 0 or (status == 2 and n_values < 6):
+                ok = False
+                break
+            if n_values < 6:
+                values[n_values] = value
+            n_values += 1
+            if comma == paren:
+                break
+            q = comma + 1
+
+        # JavaScript usa meses 0-indexed; igual que date() en Python, se exige un año y mes válidos
+        if not ok or n_values < 3 or not (1 <= values[0] <= 9999) or not (0 <= values[1] <= 11):
+            continue
+
+        if (-_SMALL <= values[2] <= _SMALL and -_SMALL <= values[3] <= _SMALL
+                and -_SMALL <= values[4] <= _SMALL and -_SMALL <= values[5] <= _SMALL):
+            days = _days_from_civil(values[0], values[1] + 1, 1) + values[2] - 1
+            timestamp = (((days * 24 + values[3]) * 60 + values[4]) * 60 + values[5]) * 1000000
+        else:
+            # Valores extremos: se calcula con enteros de Python para no desbordar
+            big = (((_days_from_civil(values[0], values[1] + 1, 1) + <object>values[2] - 1) * 24
+                    + values[3]) * 60 + values[4]) * 60 + values[5]
+            big = big * 1000000
+            if not _TIMESTAMP_MIN <= big <= _TIMESTAMP_MAX:
+                continue
+            timestamp = big
+        # Días u horas fuera de rango pueden dar un año > 9999: se descarta el punto
+        if not _TIMESTAMP_MIN <= timestamp <= _TIMESTAMP_MAX:
+            continue
+        timestamps.data.as_longlongs[count] = timestamp
+        opens.data.as_doubles[count] = open_
+        highs.data.as_doubles[count] = high
+        lows.data.as_doubles[count] = low
+        closes.data.as_doubles[count] = close
+        volumes.data.as_longlongs[count] = volume
+        pctrels.data.as_doubles[count] = pctrel
+        decimals_col.data.as_ints[count] = <int>decimals
+        count += 1
+
+    for column in (timestamps, opens, highs, lows, closes, volumes, pctrels, decimals_col):
+        array.resize(column, count)
+
+    return {
+        "timestamps": timestamps,
+        "opens": opens,
+        "highs": highs,
+        "lows": lows,
+        "closes": closes,
+        "volumes": volumes,
+        "pctrels": pctrels,
+        "decimals": decimals_col
+    }
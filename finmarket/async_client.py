@@ -0,0 +1,159 @@
+"""
+Cliente asíncrono para la API de Finmarket (requiere httpx)
+"""
+
+import asyncio
+from typing import Iterable, List
+
+from .client import (
+    FinmarketClient,
+    TimeSpan,
+    _chart_params,
+    _default_headers,
+    _json_loads,
+    _parse_chart_response,
+    _parse_search_results,
+)
+from .models import SearchResult, ChartData
+
+
+class AsyncFinmarketClient:
+    """
+    Cliente asíncrono para obtener datos financieros de Finmarket Live.
+
+    Permite lanzar muchas consultas en paralelo sobre el mismo pool de conexiones
+    (HTTP/2 si está instalado `h2`).
+
+    Ejemplo de uso:
+        async with AsyncFinmarketClient() as client:
+            charts = await client.gather_charts([3969, 4039], time_span="1Y")
+    """
+
+    BASE_URL = FinmarketClient.BASE_URL
+
+    def __init__(self, timeout: int = 30, max_connections: int = 100):
+        """
+        Inicializa el cliente asíncrono de Finmarket.
+
+        Args:
+            timeout: Tiempo máximo de espera para las peticiones (segundos)
+            max_connections: Máximo de conexiones simultáneas del pool
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("httpx es requerido para usar AsyncFinmarketClient. Instálalo con: pip install finmarket[async]")
+
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+
+        self.timeout = timeout
+        self.client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=max_connections),
+            timeout=timeout,
+            headers=_default_headers(self.BASE_URL)
+        )
+
+    async def aclose(self):
+        """Cierra el cliente HTTP y libera las conexiones abiertas"""
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncFinmarketClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def search(self, query: str, market: str = "chile") -> List[SearchResult]:
+        """
+        Busca instrumentos financieros por nombre o símbolo.
+
+        Args:
+            query: Término de búsqueda (ej: "ipsa", "banco", "copec")
+            market: Mercado a buscar (default: "chile")
+
+        Returns:
+            Lista de resultados de búsqueda
+        """
+        url = f"{self.BASE_URL}/global/buscador.html"
+        params = {
+            "SEARCH_VALUE": query,
+            "MERCADO": market
+        }
+
+        response = await self.client.get(url, params=params)
+        response.raise_for_status()
+
+        return _parse_search_results(_json_loads(response))
+
+    async def get_chart_data(
+        self,
+        id_notation: int,
+        time_span: TimeSpan = "1Y",
+        quality: str = "RLT",
+        volume: bool = False
+    ) -> ChartData:
+        """
+        Obtiene datos históricos de precios para un instrumento.
+
+        Args:
+            id_notation: ID del instrumento (obtenido de search())
+            time_span: Período de tiempo ("1D", "5D", "1M", "3M", "6M", "1Y", "3Y", "5Y", "10Y", "MAX")
+            quality: Calidad de los datos (default: "RLT")
+            volume: Incluir datos de volumen (default: False)
+
+        Returns:
+            ChartData con los puntos de datos históricos
+        """
+        url = f"{self.BASE_URL}/chart/datachart.html"
+        params = _chart_params(id_notation, time_span, quality, volume)
+
+        response = await self.client.get(url, params=params)
+        response.raise_for_status()
+
+        columns = _parse_chart_response([response.content])
+
+        return ChartData(
+            id_notation=id_notation,
+            time_span=time_span,
+            **columns
+        )
+
+    async def gather_charts(
+        self,
+        id_notations: Iterable[int],
+        time_span: TimeSpan = "1Y"
+    ) -> List[ChartData]:
+        """
+        Obtiene en paralelo los datos de gráfico de varios instrumentos.
+
+        Args:
+            id_notations: IDs de los instrumentos
+            time_span: Período de tiempo para todos los instrumentos
+
+        Returns:
+            Lista de ChartData en el mismo orden que id_notations
+        """
+        return list(await asyncio.gather(
+            *(self.get_chart_data(id_notation, time_span=time_span) for id_notation in id_notations)
+        ))
+
+    async def get_intraday(self, id_notation: int) -> ChartData:
+        """Obtiene datos intradía (1 día) para un instrumento"""
+        return await self.get_chart_data(id_notation, time_span="1D")
+
+    async def get_weekly(self, id_notation: int) -> ChartData:
+        """Obtiene datos de la última semana para un instrumento"""
+        return await self.get_chart_data(id_notation, time_span="5D")
+
+    async def get_monthly(self, id_notation: int) -> ChartData:
+        """Obtiene datos del último mes para un instrumento"""
+        return await self.get_chart_data(id_notation, time_span="1M")
+
+    async def get_yearly(self, id_notation: int) -> ChartData:
+        """Obtiene datos del último año para un instrumento"""
+        return await self.get_chart_data(id_notation, time_span="1Y")
@@ -2,16 +2,317 @@
 Cliente principal para la API de Finmarket
 """
 
-import re
+import copy
+import json
+import time
 import requests
-from datetime import datetime, date
-from typing import List, Optional, Literal
-
-from .models import SearchResult, ChartData, ChartPoint
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from array import array
+from calendar import timegm
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Literal, Union
+
+from .models import SearchResult, ChartData, _EPOCH
+
+try:
+    from . import _chart_parser
+except ImportError:
+    # Extensión opcional en Cython; sin compilar se usa el parser en Python
+    _chart_parser = None
+
+try:
+    import requests_cache
+except ImportError:
+    # Caché HTTP persistente opcional, ver FinmarketClient(http_cache=...)
+    requests_cache = None
+
+try:
+    import orjson
+    _json_decode = orjson.loads
+except ImportError:
+    _json_decode = json.loads
+
+try:
+    import brotli  # noqa: F401  (urllib3 lo usa para descomprimir "br")
+    _ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = "br, gzip, deflate"
+    except ImportError:
+        # Sin brotli no se puede descomprimir "br", así que no se anuncia
+        _ACCEPT_ENCODING = "gzip, deflate"
 
 
 TimeSpan = Literal["1D", "5D", "1M", "3M", "6M", "1Y", "3Y", "5Y", "10Y", "MAX"]
 
+_BASE_URL = "https://bancobci.finmarketslive.cl/www"
+
+# Marcador de inicio de cada objeto en la respuesta de datachart
+_OBJECT_START = '{date:new Date('
+_FLOAT_FIELDS = frozenset(('close', 'high', 'low', 'open', 'pctrel'))
+_INT_FIELDS = frozenset(('volume', 'decimals'))
+# Rangos que admiten las columnas enteras (array 'q' e 'i'); fuera de ellos el valor se descarta
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+_INT_RANGES = {'volume': (_INT64_MIN, _INT64_MAX), 'decimals': (-2 ** 31, 2 ** 31 - 1)}
+# Rango de timestamps (microsegundos desde _EPOCH) que datetime puede representar
+_TIMESTAMP_MIN = (datetime.min - _EPOCH) // timedelta(microseconds=1)
+_TIMESTAMP_MAX = (datetime.max - _EPOCH) // timedelta(microseconds=1)
+# Tamaño de los bloques leídos del socket al descargar datachart
+_CHUNK_SIZE = 65536
+# Vigencia de los datos en caché (segundos), por período; la usan tanto la caché en
+# memoria de get_chart_data como la caché HTTP en disco
+_CACHE_EXPIRE = {"1D": 60, "5D": 300}
+_CACHE_DEFAULT_EXPIRE = 86400
+
+
+def _iter_chart_objects(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Agrupa los bloques de texto recibidos en objetos completos.
+
+    Cada objeto entregado es el texto hasta su '}' de cierre (sin incluirlo); lo que
+    queda después del último '}' se guarda hasta que llegue el siguiente bloque.
+    """
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        *objects, buffer = buffer.split('}')
+        yield from objects
+
+
+def _parse_chart_chunks(chunks: Iterable[str]) -> Dict[str, Any]:
+    """
+    Parsea la respuesta del endpoint datachart que viene en formato JavaScript.
+
+    El formato es: [{date:new Date(2026, 0, 16, 12, 14, 56), close:0.16, ...}, ...]
+
+    Args:
+        chunks: Bloques de texto de la respuesta, en orden (puede ser [text])
+
+    Returns:
+        Diccionario con una columna por campo, listo para pasar a ChartData
+    """
+    timestamps = array('q')
+    opens = array('d')
+    highs = array('d')
+    lows = array('d')
+    closes = array('d')
+    volumes = array('q')
+    pctrels = array('d')
+    decimals = array('i')
+    _timegm = timegm  # Referencia local, evita la búsqueda global en el bucle
+
+    # El formato es rígido, así que basta con find/partition en lugar de regex
+    for obj in _iter_chart_objects(chunks):
+        start = obj.find(_OBJECT_START)
+        if start < 0:
+            continue
+        date_part, _, rest_part = obj[start + len(_OBJECT_START):].partition(')')
+        point_data = {}
+
+        # Extraer valores numéricos del resto del objeto (pares clave:valor)
+        for pair in rest_part.split(','):
+            key, _, value = pair.partition(':')
+            key = key.strip()
+            try:
+                if key in _FLOAT_FIELDS:
+                    point_data[key] = float(value)
+                elif key in _INT_FIELDS:
+                    number = int(float(value))
+                    low, high = _INT_RANGES[key]
+                    if low <= number <= high:
+                        point_data[key] = number
+            except (ValueError, OverflowError):
+                # Valores no numéricos o no finitos (ej: null, Infinity): se omite el campo
+                continue
+
+        if 'close' not in point_data:
+            continue
+
+        # Parsear la fecha: year, month, day[, hour, minute, second]
+        # (ValueError si hay menos de 3 valores, alguno no es entero o el mes no es válido;
+        # OverflowError si el año o el mes no caben en un entero de C)
+        try:
+            year, month, day, *time_values = map(int, date_part.split(','))
+            hour, minute, second = (time_values + [0, 0, 0])[:3]
+            # JavaScript los meses son 0-indexed, Python no
+            seconds = _timegm((year, month + 1, day, hour, minute, second))
+        except (ValueError, OverflowError):
+            continue
+
+        # Se guarda como epoch en microsegundos; datetime se construye bajo demanda
+        timestamp = seconds * 1000000
+        # Días u horas fuera de rango pueden dar un año > 9999: se descarta el punto para
+        # que ChartData.dates/points no fallen después
+        if not _TIMESTAMP_MIN <= timestamp <= _TIMESTAMP_MAX:
+            continue
+        timestamps.append(timestamp)
+        opens.append(point_data.get('open', 0.0))
+        highs.append(point_data.get('high', 0.0))
+        lows.append(point_data.get('low', 0.0))
+        closes.append(point_data['close'])
+        volumes.append(point_data.get('volume', 0))
+        pctrels.append(point_data.get('pctrel', 0.0))
+        decimals.append(point_data.get('decimals', 2))
+
+    return {
+        'timestamps': timestamps,
+        'opens': opens,
+        'highs': highs,
+        'lows': lows,
+        'closes': closes,
+        'volumes': volumes,
+        'pctrels': pctrels,
+        'decimals': decimals
+    }
+
+
+def _parse_chart_response(chunks: Iterable[bytes]) -> Dict[str, Any]:
+    """
+    Parsea la respuesta de datachart (en bytes) con la extensión en C si está compilada.
+
+    La extensión necesita el cuerpo completo, así que en ese caso se juntan los
+    bloques de bytes sin decodificarlos; sin ella se parsea bloque a bloque en Python.
+    """
+    if _chart_parser is not None:
+        return _chart_parser.parse_chart(b''.join(chunks))
+    # La respuesta es ASCII; latin-1 decodifica byte a byte, así que un bloque puede cortarse en cualquier punto
+    return _parse_chart_chunks(chunk.decode("latin-1") for chunk in chunks)
+
+
+def _json_loads(response: Any) -> Any:
+    """
+    Decodifica el cuerpo JSON de una respuesta con orjson si está instalado (si no, con json).
+
+    Los bytes se pasan directo solo si la respuesta no declara charset o es UTF-8; con
+    otro charset (ej: text/html o ISO-8859-1) se decodifica con response.text, igual
+    que response.json(). Los errores se relanzan como requests.exceptions.JSONDecodeError
+    para que sigan siendo una RequestException.
+    """
+    encoding = response.encoding
+    try:
+        if encoding is None or encoding.lower().replace("_", "-") in ("utf-8", "utf8"):
+            return _json_decode(response.content)
+        return _json_decode(response.text)
+    except json.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+    except UnicodeDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(str(e), "", 0) from e
+
+
+def _default_headers(base_url: str) -> Dict[str, str]:
+    """Headers que imitan al navegador, compartidos por el cliente síncrono y el async"""
+    return {
+        "accept": "application/json, text/javascript, */*; q=0.01",
+        "accept-encoding": _ACCEPT_ENCODING,
+        "accept-language": "en-US,en;q=0.9,es;q=0.8",
+        "referer": f"{base_url}/index.html",
+        "sec-ch-ua": '"Not(A:Brand";v="8", "Chromium";v="144", "Google Chrome";v="144"',
+        "sec-ch-ua-mobile": "?0",
+        "sec-ch-ua-platform": '"Windows"',
+        "sec-fetch-dest": "empty",
+        "sec-fetch-mode": "cors",
+        "sec-fetch-site": "same-origin",
+        "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36",
+        "x-requested-with": "XMLHttpRequest"
+    }
+
+
+def _setup_session(session: requests.Session, base_url: str):
+    """
+    Configura los headers por defecto y el pool de conexiones de la sesión.
+
+    Solo se usa con sesiones creadas por el cliente; montar el adapter en una sesión
+    ajena reemplazaría los adapters que haya configurado quien la pasó.
+    """
+    session.headers.update(_default_headers(base_url))
+
+    # Pool amplio para uso concurrente y reintentos ante errores transitorios del servidor.
+    # raise_on_status=False deja que raise_for_status() lance HTTPError como siempre.
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=100, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+# Sesión compartida por los clientes creados sin `session`; se crea al primer uso
+_DEFAULT_SESSION: Optional[requests.Session] = None
+
+
+def _get_default_session() -> requests.Session:
+    """Devuelve la sesión compartida, creándola y configurándola la primera vez"""
+    global _DEFAULT_SESSION
+    if _DEFAULT_SESSION is None:
+        session = requests.Session()
+        _setup_session(session, _BASE_URL)
+        _DEFAULT_SESSION = session
+    return _DEFAULT_SESSION
+
+
+def _create_cached_session(cache_name: Optional[str] = None) -> requests.Session:
+    """
+    Crea una sesión con caché HTTP persistente en SQLite (requiere requests-cache).
+
+    Sin `cache_name` la base de datos se guarda en el directorio de caché del usuario.
+    """
+    if requests_cache is None:
+        raise ImportError("requests-cache es requerido para usar http_cache. Instálalo con: pip install finmarket[cache]")
+
+    if cache_name is None:
+        return requests_cache.CachedSession(
+            "finmarket", backend="sqlite", use_cache_dir=True, expire_after=_CACHE_DEFAULT_EXPIRE
+        )
+    return requests_cache.CachedSession(
+        cache_name, backend="sqlite", expire_after=_CACHE_DEFAULT_EXPIRE
+    )
+
+
+def _chart_params(id_notation: int, time_span: str, quality: str, volume: bool) -> Dict[str, Any]:
+    """Parámetros de la consulta a datachart"""
+    params = {
+        "ID_NOTATION": id_notation,
+        "QUALITY": quality,
+        "VOLUME": str(volume).lower()
+    }
+
+    # Si es MAX, usar parámetros de fecha en lugar de TIME_SPAN
+    if time_span == "MAX":
+        params["DATEINI"] = "1900-01-01"
+        params["DATEFIN"] = date.today().strftime("%Y-%m-%d")
+    else:
+        params["TIME_SPAN"] = time_span
+
+    return params
+
+
+def _parse_search_results(data: Any) -> List[SearchResult]:
+    """Convierte la respuesta JSON del buscador en una lista de SearchResult"""
+    results = []
+
+    if isinstance(data, list):
+        for item in data:
+            # Las claves pueden venir en mayúsculas o minúsculas; se normalizan una vez
+            fields = {key.lower(): value for key, value in item.items()}
+            result = SearchResult(
+                id_notation=int(fields.get("id_notation") or fields.get("id") or 0),
+                name=fields.get("name") or "",
+                symbol=fields.get("symbol"),
+                market=fields.get("market"),
+                type=fields.get("type"),
+                raw_data=item
+            )
+            results.append(result)
+
+    return results
+
 
 class FinmarketClient:
     """
@@ -25,36 +326,70 @@ class FinmarketClient:
 
         # Obtener datos del gráfico
         chart = client.get_chart_data(id_notation=4039, time_span="1Y")
+
+    Por defecto todas las instancias comparten una misma sesión HTTP, de modo que
+    las conexiones keep-alive se reutilizan aunque se creen varios clientes. Se
+    puede pasar una sesión propia con `session=`; en ese caso conviene cerrarla al
+    terminar con close() (o usar el cliente como context manager:
+    `with FinmarketClient(session=requests.Session()) as client: ...`).
     """
 
-    BASE_URL = "https://bancobci.finmarketslive.cl/www"
+    BASE_URL = _BASE_URL
 
-    def __init__(self, timeout: int = 30):
+    def __init__(
+        self,
+        timeout: int = 30,
+        cache_size: int = 256,
+        session: Optional[requests.Session] = None,
+        http_cache: Union[bool, str] = False
+    ):
         """
         Inicializa el cliente de Finmarket.
 
         Args:
             timeout: Tiempo máximo de espera para las peticiones (segundos)
+            cache_size: Máximo de gráficos guardados en memoria por get_chart_data (0 desactiva la caché)
+            session: Sesión de requests a usar (default: sesión compartida entre clientes).
+                Solo se le agregan los headers por defecto; sus adapters no se modifican.
+            http_cache: Guardar las respuestas en una caché HTTP en disco que persiste entre
+                ejecuciones (requiere requests-cache). True usa el directorio de caché del
+                usuario; un str indica la ruta de la base de datos SQLite.
         """
+        if session is not None and http_cache:
+            raise ValueError("No se puede usar session y http_cache a la vez")
+
         self.timeout = timeout
-        self.session = requests.Session()
-        self._setup_session()
-
-    def _setup_session(self):
-        """Configura los headers por defecto de la sesión"""
-        self.session.headers.update({
-            "accept": "application/json, text/javascript, */*; q=0.01",
-            "accept-language": "en-US,en;q=0.9,es;q=0.8",
-            "referer": f"{self.BASE_URL}/index.html",
-            "sec-ch-ua": '"Not(A:Brand";v="8", "Chromium";v="144", "Google Chrome";v="144"',
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": '"Windows"',
-            "sec-fetch-dest": "empty",
-            "sec-fetch-mode": "cors",
-            "sec-fetch-site": "same-origin",
-            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36",
-            "x-requested-with": "XMLHttpRequest"
-        })
+        if http_cache:
+            self.session = _create_cached_session(None if http_cache is True else http_cache)
+            _setup_session(self.session, self.BASE_URL)
+        elif session is None:
+            self.session = _get_default_session()
+        else:
+            # Sesión del usuario: solo se agregan los headers, sin tocar sus adapters
+            self.session = session
+            self.session.headers.update(_default_headers(self.BASE_URL))
+        # Las sesiones con caché aceptan una vigencia por petición (ver _CACHE_EXPIRE)
+        self._http_cache = requests_cache is not None and isinstance(self.session, requests_cache.CachedSession)
+        self._cached_chart_data = lru_cache(maxsize=cache_size)(self._fetch_chart_data)
+
+    def close(self):
+        """
+        Cierra la sesión HTTP y libera las conexiones abiertas.
+
+        La sesión compartida por defecto no se cierra, ya que la usan otros clientes.
+        """
+        if self.session is not _DEFAULT_SESSION:
+            self.session.close()
+
+    def __enter__(self) -> "FinmarketClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def clear_cache(self):
+        """Descarta los gráficos guardados en la caché de get_chart_data"""
+        self._cached_chart_data.cache_clear()
 
     def search(self, query: str, market: str = "chile") -> List[SearchResult]:
         """
@@ -81,22 +416,7 @@ class FinmarketClient:
         response = self.session.get(url, params=params, timeout=self.timeout)
         response.raise_for_status()
 
-        data = response.json()
-        results = []
-
-        if isinstance(data, list):
-            for item in data:
-                result = SearchResult(
-                    id_notation=int(item.get("ID_NOTATION") or item.get("id_notation") or item.get("id") or 0),
-                    name=item.get("NAME") or item.get("name") or "",
-                    symbol=item.get("SYMBOL") or item.get("symbol"),
-                    market=item.get("MARKET") or item.get("market"),
-                    type=item.get("TYPE") or item.get("type"),
-                    raw_data=item
-                )
-                results.append(result)
-
-        return results
+        return _parse_search_results(_json_loads(response))
 
     def get_chart_data(
         self,
@@ -117,88 +437,60 @@ class FinmarketClient:
         Returns:
             ChartData con los puntos de datos históricos
 
+        Las respuestas se guardan en memoria: una consulta repetida devuelve una copia
+        del resultado anterior sin volver a la red (durante un minuto para "1D", cinco
+        minutos para "5D" y el mismo día para el resto). Usar clear_cache() para forzar
+        una nueva descarga.
+
         Ejemplo:
             chart = client.get_chart_data(4039, time_span="1Y")
             for point in chart.points:
                 print(f"{point.date}: {point.close}")
         """
-        url = f"{self.BASE_URL}/chart/datachart.html"
-        params = {
-            "ID_NOTATION": id_notation,
-            "QUALITY": quality,
-            "VOLUME": str(volume).lower()
-        }
-
-        # Si es MAX, usar parámetros de fecha en lugar de TIME_SPAN
-        if time_span == "MAX":
-            params["DATEINI"] = "1900-01-01"
-            params["DATEFIN"] = date.today().strftime("%Y-%m-%d")
+        expire = _CACHE_EXPIRE.get(time_span)
+        if expire is not None:
+            bucket = int(time.time() // expire)
         else:
-            params["TIME_SPAN"] = time_span
+            bucket = date.today().toordinal()
 
-        response = self.session.get(url, params=params, timeout=self.timeout)
-        response.raise_for_status()
-
-        points = self._parse_chart_response(response.text)
+        # Se devuelve una copia para que el llamador pueda modificarla sin tocar la caché
+        chart = self._cached_chart_data(id_notation, time_span, quality, volume, bucket)
+        return copy.deepcopy(chart)
 
-        return ChartData(
-            id_notation=id_notation,
-            time_span=time_span,
-            points=points
-        )
-
-    def _parse_chart_response(self, text: str) -> List[ChartPoint]:
+    def _fetch_chart_data(
+        self,
+        id_notation: int,
+        time_span: TimeSpan,
+        quality: str,
+        volume: bool,
+        _bucket: int
+    ) -> ChartData:
         """
-        Parsea la respuesta del endpoint datachart que viene en formato JavaScript.
+        Descarga y parsea los datos de gráfico (sin caché).
 
-        El formato es: [{date:new Date(2026, 0, 16, 12, 14, 56), close:0.16, ...}, ...]
+        `_bucket` solo forma parte de la clave de la caché: cambia cuando los datos
+        guardados dejan de ser vigentes.
         """
-        points = []
-
-        # Patrón mejorado para extraer cada objeto del array JavaScript
-        # Busca desde { hasta el siguiente }, considerando que puede haber new Date(...) dentro
-        object_pattern = r'\{date:new Date\(([^)]+)\)([^}]*)\}'
-        objects = re.findall(object_pattern, text)
+        url = f"{self.BASE_URL}/chart/datachart.html"
+        params = _chart_params(id_notation, time_span, quality, volume)
 
-        for date_part, rest_part in objects:
-            point_data = {}
+        kwargs = {}
+        if self._http_cache:
+            kwargs["expire_after"] = _CACHE_EXPIRE.get(time_span, _CACHE_DEFAULT_EXPIRE)
 
-            # Parsear la fecha: year, month, day, hour, minute, second
-            date_values = [int(x.strip()) for x in date_part.split(',')]
-            if len(date_values) >= 3:
-                year, month, day = date_values[0], date_values[1], date_values[2]
-                hour = date_values[3] if len(date_values) > 3 else 0
-                minute = date_values[4] if len(date_values) > 4 else 0
-                second = date_values[5] if len(date_values) > 5 else 0
-                # JavaScript los meses son 0-indexed, Python no
-                point_data['date'] = datetime(year, month + 1, day, hour, minute, second)
-            else:
-                continue
+        # Se parsea a medida que llegan los datos, sin materializar toda la respuesta
+        response = self.session.get(url, params=params, timeout=self.timeout, stream=True, **kwargs)
+        try:
+            response.raise_for_status()
+            columns = _parse_chart_response(response.iter_content(chunk_size=_CHUNK_SIZE))
+        finally:
+            response.close()
 
-            # Extraer valores numéricos del resto del objeto
-            full_obj = f"{{date:new Date({date_part}){rest_part}}}"
-            for field in ['close', 'high', 'low', 'open', 'volume', 'pctrel', 'decimals']:
-                match = re.search(rf'{field}:([-\d.]+)', full_obj)
-                if match:
-                    value = match.group(1)
-                    if field in ['volume', 'decimals']:
-                        point_data[field] = int(float(value))
-                    else:
-                        point_data[field] = float(value)
-
-            if 'date' in point_data and 'close' in point_data:
-                points.append(ChartPoint(
-                    date=point_data['date'],
-                    open=point_data.get('open', 0.0),
-                    high=point_data.get('high', 0.0),
-                    low=point_data.get('low', 0.0),
-                    close=point_data['close'],
-                    volume=point_data.get('volume', 0),
-                    pctrel=point_data.get('pctrel', 0.0),
-                    decimals=point_data.get('decimals', 2)
-                ))
-
-        return points
+        return ChartData(
+            id_notation=id_notation,
+            time_span=time_span,
+            **columns
+        )
 
     def get_intraday(self, id_notation: int) -> ChartData:
         """
@@ -2,12 +2,21 @@
 Modelos de datos para Finmarket
 """
 
+import sys
+from array import array
+from calendar import timegm
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional
 
+# dataclass(slots=True) solo existe desde Python 3.10; antes se usa un dataclass normal
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+# Origen de la columna `timestamps` (microsegundos desde 1970-01-01, sin zona horaria)
+_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass(**_SLOTS)
 class SearchResult:
     """Resultado de búsqueda de un instrumento financiero"""
     id_notation: int
@@ -18,7 +27,7 @@ class SearchResult:
     raw_data: Optional[dict] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ChartPoint:
     """Punto de datos en un gráfico"""
     date: datetime
@@ -31,29 +40,122 @@ class ChartPoint:
     decimals: int = 2
 
 
-@dataclass
+@dataclass(init=False)
 class ChartData:
-    """Datos de gráfico para un instrumento"""
+    """
+    Datos de gráfico para un instrumento.
+
+    Los datos se guardan por columnas (una secuencia por campo) en lugar de una
+    lista de ChartPoint; la propiedad `points` construye los puntos bajo demanda.
+    Las fechas se guardan como enteros en `timestamps` (microsegundos desde
+    1970-01-01) y se convierten a datetime solo cuando se piden.
+    """
     id_notation: int
     time_span: str
-    points: List[ChartPoint]
+    timestamps: array
+    opens: array
+    highs: array
+    lows: array
+    closes: array
+    volumes: array
+    pctrels: array
+    decimals: array
+
+    def __init__(
+        self,
+        id_notation: int,
+        time_span: str,
+        points: Optional[List[ChartPoint]] = None,
+        *,
+        timestamps: Optional[array] = None,
+        opens: Optional[array] = None,
+        highs: Optional[array] = None,
+        lows: Optional[array] = None,
+        closes: Optional[array] = None,
+        volumes: Optional[array] = None,
+        pctrels: Optional[array] = None,
+        decimals: Optional[array] = None
+    ):
+        """
+        Args:
+            id_notation: ID del instrumento
+            time_span: Período de tiempo de los datos
+            points: Lista de ChartPoint (alternativa a pasar las columnas)
+            timestamps, opens, highs, lows, closes, volumes, pctrels, decimals: Columnas de datos
+        """
+        self.id_notation = id_notation
+        self.time_span = time_span
+        self.timestamps = timestamps if timestamps is not None else array("q")
+        self.opens = opens if opens is not None else array("d")
+        self.highs = highs if highs is not None else array("d")
+        self.lows = lows if lows is not None else array("d")
+        self.closes = closes if closes is not None else array("d")
+        self.volumes = volumes if volumes is not None else array("q")
+        self.pctrels = pctrels if pctrels is not None else array("d")
+        self.decimals = decimals if decimals is not None else array("i")
+
+        for p in points or ():
+            self.append(p)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(self, point: ChartPoint):
+        """Agrega un punto al final de las columnas"""
+        date = point.date
+        self.timestamps.append(timegm(date.utctimetuple()) * 1000000 + date.microsecond)
+        self.opens.append(point.open)
+        self.highs.append(point.high)
+        self.lows.append(point.low)
+        self.closes.append(point.close)
+        self.volumes.append(point.volume)
+        self.pctrels.append(point.pctrel)
+        self.decimals.append(point.decimals)
 
-    def to_dataframe(self):
-        """Convierte los datos a un DataFrame de pandas"""
+    @property
+    def dates(self) -> List[datetime]:
+        """Columna de fechas como datetime, construida a partir de `timestamps`"""
+        return [_EPOCH + timedelta(microseconds=t) for t in self.timestamps]
+
+    @property
+    def points(self) -> List[ChartPoint]:
+        """
+        Lista de ChartPoint construida a partir de las columnas.
+
+        Se arma una lista nueva en cada acceso, por lo que conviene guardarla en una
+        variable; los cambios que se hagan sobre ella no se reflejan en el ChartData.
+        """
+        return [
+            ChartPoint(*row)
+            for row in zip(
+                self.dates, self.opens, self.highs, self.lows,
+                self.closes, self.volumes, self.pctrels, self.decimals
+            )
+        ]
+
+    def to_dataframe(self, downcast: bool = False):
+        """
+        Convierte los datos a un DataFrame de pandas.
+
+        Args:
+            downcast: Usar float32 en las columnas de precios y pctrel para reducir a la
+                mitad la memoria (los valores pierden precisión más allá de ~7 dígitos)
+        """
         try:
+            import numpy as np
             import pandas as pd
-            data = [
-                {
-                    "date": p.date,
-                    "open": p.open,
-                    "high": p.high,
-                    "low": p.low,
-                    "close": p.close,
-                    "volume": p.volume,
-                    "pctrel": p.pctrel
-                }
-                for p in self.points
-            ]
-            return pd.DataFrame(data)
         except ImportError:
             raise ImportError("pandas es requerido para usar to_dataframe(). Instálalo con: pip install pandas")
+
+        float_dtype = np.float32 if downcast else np.float64
+
+        # Las columnas ya están en memoria contigua, no hay trabajo por fila
+        return pd.DataFrame({
+            "date": pd.to_datetime(np.asarray(self.timestamps), unit="us"),
+            "open": np.asarray(self.opens, dtype=float_dtype),
+            "high": np.asarray(self.highs, dtype=float_dtype),
+            "low": np.asarray(self.lows, dtype=float_dtype),
+            "close": np.asarray(self.closes, dtype=float_dtype),
+            "volume": np.asarray(self.volumes, dtype=np.int64),
+            "pctrel": np.asarray(self.pctrels, dtype=float_dtype)
+        })
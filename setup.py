@@ -0,0 +1,20 @@
+"""
+Configuración de la extensión opcional en C (Cython) del parser de datachart.
+
+El resto de los metadatos del paquete está en pyproject.toml. Si no hay compilador
+disponible, la extensión se omite y se usa el parser en Python.
+"""
+
+from setuptools import Extension, setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [Extension("finmarket._chart_parser", ["finmarket/_chart_parser.pyx"], optional=True)],
+        language_level=3,
+    )
+
+setup(ext_modules=ext_modules)
@@ -2,10 +2,14 @@
 Tests para el cliente de Finmarket
 """
 
+import asyncio
+import json
 import pytest
+import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
-from unittest.mock import Mock, patch, MagicMock
-from finmarket import FinmarketClient
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+from finmarket import FinmarketClient, AsyncFinmarketClient
 from finmarket.models import SearchResult, ChartData, ChartPoint
 
 
@@ -17,7 +21,7 @@ class TestFinmarketClientSearch:
         """Test búsqueda de IPSA"""
         # Mock de la respuesta
         mock_response = Mock()
-        mock_response.json.return_value = [
+        mock_response.content = json.dumps([
             {
                 "ID_NOTATION": 3969,
                 "NAME": "IPSA",
@@ -25,7 +29,8 @@ class TestFinmarketClientSearch:
                 "MARKET": "Chile",
                 "TYPE": "Index"
             }
-        ]
+        ]).encode()
+        mock_response.encoding = "utf-8"
         mock_get.return_value = mock_response
 
         client = FinmarketClient()
@@ -40,7 +45,8 @@ class TestFinmarketClientSearch:
     def test_search_empty_results(self, mock_get):
         """Test búsqueda sin resultados"""
         mock_response = Mock()
-        mock_response.json.return_value = []
+        mock_response.content = b"[]"
+        mock_response.encoding = "utf-8"
         mock_get.return_value = mock_response
 
         client = FinmarketClient()
@@ -48,11 +54,40 @@ class TestFinmarketClientSearch:
 
         assert len(results) == 0
 
+    @patch('finmarket.client.requests.Session.get')
+    def test_search_invalid_json(self, mock_get):
+        """Test que una respuesta que no es JSON lanza la excepción de requests"""
+        mock_response = Mock()
+        mock_response.content = b"<html>error</html>"
+        mock_response.encoding = "utf-8"
+        mock_get.return_value = mock_response
+
+        client = FinmarketClient()
+        with pytest.raises(requests.exceptions.JSONDecodeError):
+            client.search("ipsa")
+
+    @patch('finmarket.client.requests.Session.get')
+    def test_search_latin1_response(self, mock_get):
+        """Test que una respuesta text/html en latin-1 se decodifica según su charset"""
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "text/html"
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = json.dumps(
+            [{"ID_NOTATION": 1, "NAME": "Compañía"}], ensure_ascii=False
+        ).encode("latin-1")
+        mock_get.return_value = response
+
+        client = FinmarketClient()
+        results = client.search("compañía")
+
+        assert results[0].name == "Compañía"
+
     @patch('finmarket.client.requests.Session.get')
     def test_search_with_alternative_keys(self, mock_get):
         """Test búsqueda con claves alternativas en la respuesta"""
         mock_response = Mock()
-        mock_response.json.return_value = [
+        mock_response.content = json.dumps([
             {
                 "id_notation": 4039,
                 "name": "ASSD",
@@ -60,7 +95,8 @@ class TestFinmarketClientSearch:
                 "market": "Chile",
                 "type": "Stock"
             }
-        ]
+        ]).encode()
+        mock_response.encoding = "utf-8"
         mock_get.return_value = mock_response
 
         client = FinmarketClient()
@@ -79,7 +115,7 @@ class TestFinmarketClientChartData:
         chart_response = "[{date:new Date(2025, 0, 21, 9, 0, 0),close:0.24,high:0.24,low:0.24,open:0.24,volume:12701745,pctrel:0.00,decimals:2}]"
         
         mock_response = Mock()
-        mock_response.text = chart_response
+        mock_response.iter_content.return_value = [chart_response.encode()]
         mock_get.return_value = mock_response
 
         client = FinmarketClient()
@@ -101,7 +137,7 @@ class TestFinmarketClientChartData:
         ]"""
         
         mock_response = Mock()
-        mock_response.text = chart_response
+        mock_response.iter_content.return_value = [chart_response.encode()]
         mock_get.return_value = mock_response
 
         client = FinmarketClient()
@@ -116,7 +152,7 @@ class TestFinmarketClientChartData:
     def test_get_chart_data_empty(self, mock_get):
         """Test obtención de datos vacíos"""
         mock_response = Mock()
-        mock_response.text = "[]"
+        mock_response.iter_content.return_value = [b"[]"]
         mock_get.return_value = mock_response
 
         client = FinmarketClient()
@@ -128,7 +164,7 @@ class TestFinmarketClientChartData:
     def test_get_chart_data_with_volume_parameter(self, mock_get):
         """Test parámetro volume=True"""
         mock_response = Mock()
-        mock_response.text = "[]"
+        mock_response.iter_content.return_value = [b"[]"]
         mock_get.return_value = mock_response
 
         client = FinmarketClient()
@@ -138,6 +174,79 @@ class TestFinmarketClientChartData:
         call_args = mock_get.call_args
         assert call_args[1]['params']['VOLUME'] == 'true'
 
+    @patch('finmarket.client.requests.Session.get')
+    def test_get_chart_data_streamed_in_chunks(self, mock_get):
+        """Test parsing de una respuesta que llega cortada en varios bloques"""
+        chart_response = (
+            "[{date:new Date(2025, 0, 21, 9, 0, 0),close:0.24,volume:12701745},"
+            "{date:new Date(2025, 0, 22, 9, 0, 0),close:0.25,volume:28054091}]"
+        )
+
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [chart_response.encode()[i:i + 7] for i in range(0, len(chart_response), 7)]
+        mock_get.return_value = mock_response
+
+        client = FinmarketClient()
+        chart = client.get_chart_data(id_notation=4039)
+
+        assert list(chart.closes) == [0.24, 0.25]
+        assert list(chart.volumes) == [12701745, 28054091]
+        assert mock_get.call_args[1]['stream'] is True
+        mock_response.close.assert_called_once()
+
+    @patch('finmarket.client.requests.Session.get')
+    def test_get_chart_data_cached(self, mock_get):
+        """Test que una consulta repetida usa la caché y devuelve copias independientes"""
+        chart_response = "[{date:new Date(2025, 0, 21, 9, 0, 0),close:0.24,volume:12701745}]"
+
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [chart_response.encode()]
+        mock_get.return_value = mock_response
+
+        client = FinmarketClient()
+        first = client.get_chart_data(id_notation=4039, time_span="1Y")
+        first.closes[0] = 99.0
+        second = client.get_chart_data(id_notation=4039, time_span="1Y")
+
+        assert mock_get.call_count == 1
+        assert second.closes[0] == 0.24
+
+        client.clear_cache()
+        client.get_chart_data(id_notation=4039, time_span="1Y")
+        assert mock_get.call_count == 2
+
+    @patch('finmarket.client.time.time')
+    @patch('finmarket.client.requests.Session.get')
+    def test_get_chart_data_weekly_cache_expires(self, mock_get, mock_time):
+        """Test que "5D" se vuelve a descargar al pasar a otro bloque de cinco minutos"""
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [b"[]"]
+        mock_get.return_value = mock_response
+
+        client = FinmarketClient()
+        mock_time.return_value = 1_000_000_200.0
+        client.get_weekly(4039)
+        mock_time.return_value = 1_000_000_490.0
+        client.get_weekly(4039)
+        assert mock_get.call_count == 1
+
+        mock_time.return_value = 1_000_000_500.0
+        client.get_weekly(4039)
+        assert mock_get.call_count == 2
+
+    @patch('finmarket.client.requests.Session.get')
+    def test_get_chart_data_cache_disabled(self, mock_get):
+        """Test que cache_size=0 desactiva la caché"""
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [b"[]"]
+        mock_get.return_value = mock_response
+
+        client = FinmarketClient(cache_size=0)
+        client.get_chart_data(id_notation=4039)
+        client.get_chart_data(id_notation=4039)
+
+        assert mock_get.call_count == 2
+
 
 class TestChartPointParsing:
     """Tests para el parsing de puntos de datos"""
@@ -149,7 +258,7 @@ class TestChartPointParsing:
         chart_response = "[{date:new Date(2025, 0, 21, 9, 30, 45),close:0.24,high:0.24,low:0.24,open:0.24,volume:12701745,pctrel:0.00,decimals:2}]"
         
         mock_response = Mock()
-        mock_response.text = chart_response
+        mock_response.iter_content.return_value = [chart_response.encode()]
         mock_get.return_value = mock_response
 
         client = FinmarketClient()
@@ -164,7 +273,7 @@ class TestChartPointParsing:
         chart_response = "[{date:new Date(2025, 0, 21, 9, 0, 0),close:0.24,decimals:2}]"
         
         mock_response = Mock()
-        mock_response.text = chart_response
+        mock_response.iter_content.return_value = [chart_response.encode()]
         mock_get.return_value = mock_response
 
         client = FinmarketClient()
@@ -184,7 +293,7 @@ class TestChartPointParsing:
         chart_response = "[{date:new Date(2025, 0, 21, 9, 0, 0),close:0.24,high:0.25,low:0.23,open:0.24,volume:12701745,pctrel:-0.83,decimals:2}]"
         
         mock_response = Mock()
-        mock_response.text = chart_response
+        mock_response.iter_content.return_value = [chart_response.encode()]
         mock_get.return_value = mock_response
 
         client = FinmarketClient()
@@ -194,6 +303,65 @@ class TestChartPointParsing:
         assert point.pctrel == -0.83
         assert point.close == 0.24
 
+    @patch('finmarket.client.requests.Session.get')
+    def test_parse_chart_response_with_spaces(self, mock_get):
+        """Test parsing de objetos con espacios entre los pares clave:valor"""
+        chart_response = "[{date:new Date(2026, 0, 16, 12, 14, 56), close:0.16, high:0.17, volume:1500, decimals:2}]"
+
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [chart_response.encode()]
+        mock_get.return_value = mock_response
+
+        client = FinmarketClient()
+        chart = client.get_chart_data(id_notation=4039)
+
+        point = chart.points[0]
+        assert point.date == datetime(2026, 1, 16, 12, 14, 56)
+        assert point.close == 0.16
+        assert point.high == 0.17
+        assert point.volume == 1500
+
+    @patch('finmarket.client.requests.Session.get')
+    def test_parse_chart_response_out_of_range_values(self, mock_get):
+        """Test que valores no finitos o fuera de rango se omiten en lugar de fallar"""
+        chart_response = (
+            "[{date:new Date(2025, 0, 21, 9, 0, 0),close:0.24,volume:Infinity,decimals:3000000000},"
+            "{date:new Date(2025, 0, 22, 9, 0, 0),close:0.25,volume:1e400},"
+            "{date:new Date(2025, 0, 23, 99999999999999, 0, 0),close:0.26},"
+            "{date:new Date(99999999999999999999, 0, 23),close:0.27},"
+            "{date:new Date(2025, 0, 23, 100000000, 0, 0),close:0.28},"
+            "{date:new Date(2025, 0, 5000000),close:0.29}]"
+        )
+
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [chart_response.encode()]
+        mock_get.return_value = mock_response
+
+        client = FinmarketClient()
+        chart = client.get_chart_data(id_notation=4039)
+
+        assert list(chart.closes) == [0.24, 0.25]
+        assert list(chart.volumes) == [0, 0]
+        assert list(chart.decimals) == [2, 2]
+        assert [point.close for point in chart.points] == [0.24, 0.25]
+
+    def test_parse_chart_c_extension_matches_python(self):
+        """Test que la extensión en C (si está compilada) da el mismo resultado que el parser en Python"""
+        chart_parser = pytest.importorskip("finmarket._chart_parser")
+        from finmarket.client import _parse_chart_chunks
+
+        chart_response = (
+            "[{date:new Date(2025, 0, 21, 9, 30, 45),close:0.24,high:0.25,low:0.23,open:0.24,volume:12701745,pctrel:-0.83,decimals:2},"
+            "{date:new Date(2026, 0, 16), close:0.16, high:null, volume:1.9},"
+            "{date:new Date(2025, 12, 1),close:1},{date:new Date(2025, 0),close:1},"
+            "{date:new Date(2025, 0, 1),open:1}]"
+        )
+
+        expected = _parse_chart_chunks([chart_response])
+        result = chart_parser.parse_chart(chart_response.encode())
+
+        assert result == expected
+
 
 class TestClientInitialization:
     """Tests para la inicialización del cliente"""
@@ -217,6 +385,63 @@ class TestClientInitialization:
         assert "x-requested-with" in headers
         assert headers["x-requested-with"] == "XMLHttpRequest"
         assert "Chrome" in headers["user-agent"]
+        assert "gzip" in headers["accept-encoding"]
+
+    def test_client_session_adapter_setup(self):
+        """Test que la sesión tiene un pool amplio y reintentos para GET"""
+        client = FinmarketClient()
+        adapter = client.session.get_adapter(client.BASE_URL)
+
+        assert adapter._pool_maxsize == 100
+        assert adapter.max_retries.total == 3
+        assert 503 in adapter.max_retries.status_forcelist
+
+    def test_client_keeps_session_adapters(self):
+        """Test que una sesión propia conserva sus adapters y recibe los headers"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=5)
+        session.mount("https://", adapter)
+        client = FinmarketClient(session=session)
+
+        assert client.session.get_adapter(client.BASE_URL) is adapter
+        assert "referer" in client.session.headers
+
+    def test_client_context_manager_closes_session(self):
+        """Test que el context manager cierra la sesión propia al salir"""
+        session = requests.Session()
+        with patch.object(session, 'close') as mock_close:
+            with FinmarketClient(session=session) as client:
+                assert client.session is session
+                assert client.session.headers["x-requested-with"] == "XMLHttpRequest"
+            mock_close.assert_called_once()
+
+    def test_client_shares_default_session(self):
+        """Test que los clientes sin sesión propia comparten la sesión por defecto"""
+        with patch('finmarket.client.requests.Session.close') as mock_close:
+            with FinmarketClient() as client:
+                other = FinmarketClient()
+                assert client.session is other.session
+            mock_close.assert_not_called()
+
+    def test_client_http_cache(self, tmp_path):
+        """Test caché HTTP en disco con vigencia según el período"""
+        requests_cache = pytest.importorskip("requests_cache")
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [b"[]"]
+
+        with FinmarketClient(http_cache=str(tmp_path / "cache")) as client:
+            assert isinstance(client.session, requests_cache.CachedSession)
+            with patch.object(client.session, 'get', return_value=mock_response) as mock_get:
+                client.get_intraday(4039)
+                client.get_yearly(4039)
+
+        assert mock_get.call_args_list[0][1]['expire_after'] == 60
+        assert mock_get.call_args_list[1][1]['expire_after'] == 86400
+
+    def test_client_http_cache_with_session_fails(self):
+        """Test que no se puede combinar session con http_cache"""
+        with pytest.raises(ValueError):
+            FinmarketClient(session=requests.Session(), http_cache=True)
 
 
 class TestConvenientMethods:
@@ -271,6 +496,46 @@ class TestConvenientMethods:
         assert result == mock_chart
 
 
+class TestAsyncFinmarketClient:
+    """Tests para el cliente asíncrono"""
+
+    def test_async_search(self):
+        """Test búsqueda asíncrona"""
+        pytest.importorskip("httpx")
+        mock_response = Mock()
+        mock_response.content = json.dumps([{"ID_NOTATION": 3969, "NAME": "IPSA"}]).encode()
+        mock_response.encoding = "utf-8"
+
+        async def run():
+            async with AsyncFinmarketClient() as client:
+                with patch.object(client.client, 'get', AsyncMock(return_value=mock_response)):
+                    return await client.search("ipsa")
+
+        results = asyncio.run(run())
+
+        assert len(results) == 1
+        assert results[0].id_notation == 3969
+
+    def test_async_gather_charts(self):
+        """Test obtención en paralelo de varios gráficos"""
+        pytest.importorskip("httpx")
+        mock_response = Mock()
+        mock_response.content = b"[{date:new Date(2025, 0, 21, 9, 0, 0),close:0.24,volume:12701745}]"
+
+        async def run():
+            async with AsyncFinmarketClient() as client:
+                with patch.object(client.client, 'get', AsyncMock(return_value=mock_response)) as mock_get:
+                    charts = await client.gather_charts([3969, 4039], time_span="1M")
+                    return charts, mock_get
+
+        charts, mock_get = asyncio.run(run())
+
+        assert [c.id_notation for c in charts] == [3969, 4039]
+        assert charts[1].points[0].close == 0.24
+        assert mock_get.call_count == 2
+        assert mock_get.call_args[1]['params']['TIME_SPAN'] == "1M"
+
+
 class TestChartDataMethods:
     """Tests para métodos de ChartData"""
 
@@ -327,6 +592,50 @@ class TestChartDataMethods:
             assert len(result) == 2
             assert result.iloc[0]['close'] == 0.24
             assert result.iloc[1]['close'] == 0.25
+            assert result.iloc[1]['date'] == pandas.Timestamp(2025, 1, 22)
+        except ImportError:
+            pytest.skip("pandas no está instalado")
+
+    def test_chart_data_to_dataframe_empty(self):
+        """Test conversión a DataFrame sin puntos mantiene columnas y tipos"""
+        chart = ChartData(id_notation=4039, time_span="1Y", points=[])
+
+        try:
+            import pandas
+            result = chart.to_dataframe()
+            assert len(result) == 0
+            assert list(result.columns) == ["date", "open", "high", "low", "close", "volume", "pctrel"]
+            assert str(result["volume"].dtype) == "int64"
+        except ImportError:
+            pytest.skip("pandas no está instalado")
+
+    def test_chart_data_columns_from_points(self):
+        """Test que ChartData guarda los puntos por columnas"""
+        points = [
+            ChartPoint(date=datetime(2025, 1, 21), open=0.24, high=0.25, low=0.23,
+                       close=0.24, volume=12701745, pctrel=0.0),
+            ChartPoint(date=datetime(2025, 1, 22), open=0.24, high=0.26, low=0.24,
+                       close=0.25, volume=28054091, pctrel=4.17, decimals=3)
+        ]
+        chart = ChartData(id_notation=4039, time_span="1Y", points=points)
+
+        assert len(chart) == 2
+        assert list(chart.closes) == [0.24, 0.25]
+        assert list(chart.volumes) == [12701745, 28054091]
+        assert chart.points == points
+
+    def test_chart_data_to_dataframe_downcast(self):
+        """Test conversión a DataFrame con columnas float32"""
+        point = ChartPoint(date=datetime(2025, 1, 21), open=0.24, high=0.25, low=0.23,
+                           close=0.24, volume=12701745, pctrel=0.0)
+        chart = ChartData(id_notation=4039, time_span="1Y", points=[point])
+
+        try:
+            import pandas
+            result = chart.to_dataframe(downcast=True)
+            assert str(result["close"].dtype) == "float32"
+            assert str(result["volume"].dtype) == "int64"
+            assert result.iloc[0]['close'] == pytest.approx(0.24)
         except ImportError:
             pytest.skip("pandas no está instalado")
 